@@ -1,241 +1,409 @@
-import xml.etree.ElementTree as ET
-from typing import Dict, List, Optional
+try:
+    from lxml import etree as ET
+    HAS_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    HAS_LXML = False
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+from concurrent.futures import ProcessPoolExecutor
+from sys import intern
+from typing import TYPE_CHECKING, BinaryIO, Dict, List, Optional, Union
+import io
 import json
-import csv
-import pandas as pd
+import logging
+import os
+import sys
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+CSV_BUFFER_SIZE = 1024 * 1024
+# Label values longer than this are unlikely to repeat, so they are not interned
+INTERN_MAX_LENGTH = 64
+# Label groups that always get a column in the events DataFrame
+CORE_LABELS = ('Action', 'Half', 'Team')
+
+class Event:
+    """A single match event; labels maps each label group to its value"""
+    __slots__ = ('id', 'start_time', 'end_time', 'code', 'labels')
+    
+    def __init__(self, id=None, start_time=None, end_time=None, code=None, labels=None):
+        self.id = id
+        self.start_time = start_time
+        self.end_time = end_time
+        self.code = code
+        self.labels = labels if labels is not None else {}
+    
+    def to_dict(self) -> Dict:
+        """Plain dict form of the event, as used for JSON export"""
+        return {
+            'id': self.id,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'code': self.code,
+            'labels': self.labels
+        }
 
 class InstatEventParser:
-    def __init__(self, xml_file_path: str):
+    def __init__(self, xml_file_path: Union[str, bytes, BinaryIO]):
+        # Raw XML bytes (e.g. an upload) are parsed from memory, never written to disk
+        if isinstance(xml_file_path, (bytes, bytearray)):
+            xml_file_path = io.BytesIO(xml_file_path)
         self.xml_file_path = xml_file_path
-        self.tree = None
-        self.root = None
         self.events = []
+        self._df = None
+        self._groups = {}
+        self._csv_headers = None
+        self._found_instances = False
         
     def parse_xml(self):
-        """Parse the XML file and extract all events"""
-        try:
-            self.tree = ET.parse(self.xml_file_path)
-            self.root = self.tree.getroot()
-            print(f"Successfully loaded XML file: {self.xml_file_path}")
+        """Check that the XML file exists; events are streamed by extract_events()"""
+        if hasattr(self.xml_file_path, 'read'):
+            # File-like and in-memory sources are streamed as they are
             return True
-        except ET.ParseError as e:
-            print(f"Error parsing XML: {e}")
-            return False
-        except FileNotFoundError:
-            print(f"File not found: {self.xml_file_path}")
+        if not os.path.exists(self.xml_file_path):
+            logger.error("File not found: %s", self.xml_file_path)
             return False
+        logger.info("Successfully loaded XML file: %s", self.xml_file_path)
+        return True
     
     def extract_events(self):
-        """Extract all event instances from the XML"""
-        if not self.root:
-            print("XML not loaded. Call parse_xml() first.")
+        """Stream all event instances from the XML without building the full tree"""
+        self.events = []
+        self._df = None
+        self._groups = {}
+        try:
+            for instance in self._iter_instances():
+                event = self._parse_instance(instance)
+                if event:
+                    self.events.append(event)
+        except ET.ParseError as e:
+            # Don't keep the events streamed before the error - they are only part of the match
+            self.events = []
+            self._df = None
+            logger.error("Error parsing XML: %s", e)
             return
-        
-        instances = self.root.find('.//ALL_INSTANCES')
-        if instances is None:
-            print("No ALL_INSTANCES found in XML")
+        except OSError as e:
+            self.events = []
+            self._df = None
+            logger.error("Error reading XML: %s", e)
             return
         
-        self.events = []
-        for instance in instances.findall('instance'):
-            event = self._parse_instance(instance)
-            if event:
-                self.events.append(event)
+        if not self._found_instances:
+            logger.error("No ALL_INSTANCES found in XML")
+            return
         
-        print(f"Extracted {len(self.events)} events")
+        logger.info("Extracted %d events", len(self.events))
         return self.events
     
-    def _parse_instance(self, instance) -> Optional[Dict]:
-        """Parse a single event instance"""
-        event = {}
+    @classmethod
+    def parse_many(cls, xml_file_paths: List[str], max_workers: Optional[int] = None) -> List[List[Event]]:
+        """Parse several XML files in parallel worker processes, returning the events of each file"""
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(cls._parse_one, xml_file_paths))
+    
+    @classmethod
+    def _parse_one(cls, xml_file_path: str) -> List[Event]:
+        """Worker entry point for parse_many"""
+        return cls(xml_file_path).extract_events() or []
+    
+    def _iter_instances(self):
+        """Yield each instance element, releasing it once the caller is done with it
+        
+        Sets _found_instances once an ALL_INSTANCES element has been seen
+        """
+        self._found_instances = False
+        if hasattr(self.xml_file_path, 'seek'):
+            # Rewind in-memory sources so events can be extracted more than once
+            self.xml_file_path.seek(0)
         
-        # Extract basic info
-        id_elem = instance.find('ID')
-        start_elem = instance.find('start')
-        end_elem = instance.find('end')
-        code_elem = instance.find('code')
+        if HAS_LXML:
+            # lxml only materializes <instance> elements (without whitespace-only text nodes)
+            # and lets us drop finished siblings. Uploads are untrusted, so external entities
+            # are never resolved and nothing is fetched over the network.
+            for _, elem in ET.iterparse(self.xml_file_path, events=('end',), tag=('ALL_INSTANCES', 'instance'),
+                                         remove_blank_text=True, resolve_entities=False, no_network=True):
+                if elem.tag == 'ALL_INSTANCES':
+                    self._found_instances = True
+                    continue
+                
+                # Like find('.//ALL_INSTANCES').findall('instance'): only direct children of
+                # the first ALL_INSTANCES are events
+                parent = elem.getparent()
+                if self._found_instances or parent is None or parent.tag != 'ALL_INSTANCES':
+                    continue
+                
+                yield elem
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del parent[0]
+            return
         
-        if id_elem is not None:
-            event['id'] = int(id_elem.text)
-        if start_elem is not None:
-            event['start_time'] = float(start_elem.text)
-        if end_elem is not None:
-            event['end_time'] = float(end_elem.text)
-        if code_elem is not None:
-            event['code'] = code_elem.text
+        instances = None
+        depth = 0  # nesting level below ALL_INSTANCES
+        for event_type, elem in ET.iterparse(self.xml_file_path, events=('start', 'end')):
+            if instances is None:
+                # Only the first ALL_INSTANCES is used, as with find()
+                if event_type == 'start' and elem.tag == 'ALL_INSTANCES' and not self._found_instances:
+                    instances = elem
+                    self._found_instances = True
+                continue
+            
+            if event_type == 'start':
+                depth += 1
+                continue
+            
+            if elem is instances:
+                instances = None
+                continue
+            
+            depth -= 1
+            if depth == 0 and elem.tag == 'instance':
+                yield elem
+                # Drop parsed instances so memory stays flat on large files
+                instances.clear()
+    
+    def _parse_instance(self, instance) -> Optional[Event]:
+        """Parse a single event instance in one pass over its children"""
+        event = Event()
+        labels = event.labels
         
-        # Extract labels
-        labels = {}
-        for label in instance.findall('label'):
-            group_elem = label.find('group')
-            text_elem = label.find('text')
-            if group_elem is not None and text_elem is not None:
-                group = group_elem.text
-                text = text_elem.text
-                labels[group] = text
+        for child in instance:
+            tag = child.tag
+            if tag == 'label':
+                group_elem = text_elem = None
+                for sub in child:
+                    if sub.tag == 'group':
+                        group_elem = sub
+                    elif sub.tag == 'text':
+                        text_elem = sub
+                if group_elem is not None and text_elem is not None:
+                    # Groups and most values repeat across thousands of events
+                    group, text = group_elem.text, text_elem.text
+                    if group is not None:
+                        group = intern(group)
+                    if text is not None and len(text) < INTERN_MAX_LENGTH:
+                        text = intern(text)
+                    labels[group] = text
+            elif tag == 'ID':
+                event.id = int(child.text)
+            elif tag == 'start':
+                event.start_time = float(child.text)
+            elif tag == 'end':
+                event.end_time = float(child.text)
+            elif tag == 'code':
+                event.code = intern(child.text) if child.text is not None else None
         
-        event['labels'] = labels
         return event
     
-    def get_events_by_action(self, action_type: str) -> List[Dict]:
+    @property
+    def df(self) -> 'pd.DataFrame':
+        """Events as a columnar DataFrame (one column per field and label), built on first use"""
+        if self._df is None:
+            self._df = self._build_frame()
+        return self._df
+    
+    def _build_frame(self) -> 'pd.DataFrame':
+        """Build the columnar events DataFrame using the same column names as the CSV export"""
+        import numpy as np
+        import pandas as pd
+        
+        events = self.events
+        n = len(events)
+        nan = float('nan')
+        
+        # One sweep over each event's own labels, filling a preallocated column per label group
+        label_values = {key: [None] * n for key in CORE_LABELS}
+        for row, event in enumerate(events):
+            for key, value in event.labels.items():
+                values = label_values.get(key)
+                if values is None:
+                    values = label_values[key] = [None] * n
+                values[row] = value
+        
+        label_keys = tuple(sorted(label_values))
+        # Times go straight into float64 arrays (missing times as NaN) instead of boxed lists
+        values = [
+            [event.id for event in events],
+            np.fromiter((nan if event.start_time is None else event.start_time for event in events),
+                        dtype=np.float64, count=n),
+            np.fromiter((nan if event.end_time is None else event.end_time for event in events),
+                        dtype=np.float64, count=n),
+            [event.code for event in events]
+        ]
+        values.extend(label_values[key] for key in label_keys)
+        
+        # Column names (lowercased once per label group) match the CSV export's headers
+        return pd.DataFrame(dict(zip(self._csv_headers_for(label_keys), values)))
+    
+    def _label_groups(self, column: str) -> Dict:
+        """Map each value of a label column to its row positions, grouping once on first use"""
+        groups = self._groups.get(column)
+        if groups is None:
+            groups = self.df.groupby(column, observed=True, sort=False).indices
+            self._groups[column] = groups
+        return groups
+    
+    def get_events_by_action(self, action_type: str) -> 'pd.DataFrame':
         """Get all events of a specific action type"""
-        return [event for event in self.events 
-                if event.get('labels', {}).get('Action') == action_type]
+        return self.df.iloc[self._label_groups('label_action').get(action_type, [])]
     
-    def get_events_by_team(self, team_name: str) -> List[Dict]:
-        """Get all events for a specific team"""
-        return [event for event in self.events 
-                if team_name in event.get('labels', {}).get('Team', '')]
+    def get_events_by_team(self, team_name: str, exact: bool = True) -> 'pd.DataFrame':
+        """Get all events for a specific team
+        
+        exact: match the full team label (e.g. 'Bnei Yehuda Tel-Aviv (87922)'); pass
+        False to match any team label containing team_name
+        """
+        groups = self._label_groups('label_team')
+        if exact:
+            return self.df.iloc[groups.get(team_name, [])]
+        
+        matches = [positions for team, positions in groups.items() if team_name in team]
+        if len(matches) > 1:
+            # Several team labels match - merge them back into event order
+            import numpy as np
+            return self.df.iloc[np.sort(np.concatenate(matches))]
+        return self.df.iloc[matches[0] if matches else []]
     
-    def get_events_by_half(self, half: str) -> List[Dict]:
+    def get_events_by_half(self, half: str) -> 'pd.DataFrame':
         """Get all events from a specific half"""
-        return [event for event in self.events 
-                if event.get('labels', {}).get('Half') == half]
+        return self.df.iloc[self._label_groups('label_half').get(half, [])]
     
     def get_summary_stats(self) -> Dict:
         """Get summary statistics of the match"""
         if not self.events:
             return {}
         
-        stats = {
-            'total_events': len(self.events),
-            'teams': set(),
-            'actions': {},
-            'halves': {},
-            'time_range': {'start': float('inf'), 'end': 0}
-        }
+        df = self.df
+        teams = df['label_team'].dropna().unique()
         
-        for event in self.events:
-            labels = event.get('labels', {})
-            
-            # Collect teams
-            team = labels.get('Team')
-            if team and team != 'None':
-                stats['teams'].add(team)
-            
-            # Count actions
-            action = labels.get('Action')
-            if action:
-                stats['actions'][action] = stats['actions'].get(action, 0) + 1
-            
-            # Count by half
-            half = labels.get('Half')
-            if half:
-                stats['halves'][half] = stats['halves'].get(half, 0) + 1
-            
-            # Track time range
-            if 'start_time' in event:
-                stats['time_range']['start'] = min(stats['time_range']['start'], event['start_time'])
-                stats['time_range']['end'] = max(stats['time_range']['end'], event['end_time'])
+        return {
+            'total_events': len(df),
+            'teams': [team for team in teams if team and team != 'None'],
+            'actions': {action: int(count) for action, count in df['label_action'].value_counts(sort=False).items() if action},
+            'halves': {half: int(count) for half, count in df['label_half'].value_counts(sort=False).items() if half},
+            'time_range': self._time_range()
+        }
+    
+    def _time_range(self) -> Dict:
+        """Earliest start and latest end time over events that have a start time"""
+        df = self.df
+        timed = df['start_time'].notna().to_numpy()
+        if not timed.any():
+            return {'start': float('inf'), 'end': 0}
         
-        stats['teams'] = list(stats['teams'])
-        return stats
+        # Plain float64 arrays reduce in NumPy's vectorized min/max loops
+        starts = df['start_time'].to_numpy(dtype='float64')[timed]
+        ends = df['end_time'].to_numpy(dtype='float64')[timed]
+        return {'start': float(starts.min()), 'end': float(ends.max())}
     
     def export_to_json(self, output_file: str):
         """Export parsed events to JSON file"""
         try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(self.events, f, indent=2, ensure_ascii=False)
-            print(f"Events exported to {output_file}")
+            if HAS_ORJSON:
+                # orjson serializes straight to UTF-8 bytes
+                with open(output_file, 'wb') as f:
+                    f.write(orjson.dumps(self.events, default=Event.to_dict, option=orjson.OPT_INDENT_2))
+            else:
+                with open(output_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.events, f, indent=2, ensure_ascii=False, default=Event.to_dict)
+            logger.info("Events exported to %s", output_file)
         except Exception as e:
-            print(f"Error exporting to JSON: {e}")
+            logger.error("Error exporting to JSON: %s", e)
     
-    def export_to_csv(self, output_file: str):
-        """Export parsed events to CSV file"""
-        try:
-            if not self.events:
-                print("No events to export")
-                return
-            
-            # Flatten the nested structure for CSV
-            flattened_data = []
-            for event in self.events:
-                row = {
-                    'id': event.get('id'),
-                    'start_time': event.get('start_time'),
-                    'end_time': event.get('end_time'),
-                    'code': event.get('code')
-                }
-                
-                # Add all labels as separate columns
-                labels = event.get('labels', {})
-                for key, value in labels.items():
-                    row[f'label_{key.lower()}'] = value
-                
-                flattened_data.append(row)
-            
-            # Create DataFrame and export to CSV
-            df = pd.DataFrame(flattened_data)
-            df.to_csv(output_file, index=False, encoding='utf-8')
-            print(f"Events exported to {output_file}")
-            print(f"CSV contains {len(df)} rows and {len(df.columns)} columns")
-            
-        except Exception as e:
-            print(f"Error exporting to CSV: {e}")
+    def export_to_csv(self, output_file: str, flush_every: int = 0):
+        """Export parsed events to CSV file (alias of export_to_simple_csv)"""
+        self.export_to_simple_csv(output_file, flush_every=flush_every)
     
-    def export_to_simple_csv(self, output_file: str):
-        """Export parsed events to a simple CSV file without pandas"""
+    def export_to_simple_csv(self, output_file: str, flush_every: int = 0):
+        """Export parsed events to a simple CSV file without pandas
+        
+        flush_every: if > 0, flush and fsync the file every N rows so long exports
+        checkpoint to disk as they go (default 0 = only at close, fastest)
+        """
+        import csv
+        
         try:
             if not self.events:
-                print("No events to export")
+                logger.warning("No events to export")
                 return
             
             # Get all unique label keys to create headers
             all_label_keys = set()
             for event in self.events:
-                labels = event.get('labels', {})
-                all_label_keys.update(labels.keys())
+                all_label_keys.update(event.labels.keys())
             
-            # Create headers
-            headers = ['id', 'start_time', 'end_time', 'code']
-            label_headers = [f'label_{key.lower()}' for key in sorted(all_label_keys)]
-            headers.extend(label_headers)
+            sorted_keys = tuple(sorted(all_label_keys))
+            headers = self._csv_headers_for(sorted_keys)
             
-            with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(headers)
-                
-                for event in self.events:
-                    row = [
-                        event.get('id', ''),
-                        event.get('start_time', ''),
-                        event.get('end_time', ''),
-                        event.get('code', '')
-                    ]
+            def rows():
+                for i, event in enumerate(self.events):
+                    if flush_every and i and i % flush_every == 0:
+                        csvfile.flush()
+                        os.fsync(csvfile.fileno())
+                    
+                    # csv writes None as an empty field
+                    row = [event.id, event.start_time, event.end_time, event.code]
                     
-                    labels = event.get('labels', {})
-                    for key in sorted(all_label_keys):
-                        row.append(labels.get(key, ''))
+                    labels_get = event.labels.get
+                    row.extend([labels_get(key, '') for key in sorted_keys])
                     
-                    writer.writerow(row)
+                    yield row
             
-            print(f"Events exported to {output_file}")
-            print(f"CSV contains {len(self.events)} rows and {len(headers)} columns")
+            # Large write buffer + writerows keeps syscalls and per-row calls down
+            with open(output_file, 'w', newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE) as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(headers)
+                writer.writerows(rows())
+            
+            logger.info("Events exported to %s", output_file)
+            logger.info("CSV contains %d rows and %d columns", len(self.events), len(headers))
             
         except Exception as e:
-            print(f"Error exporting to CSV: {e}")
+            logger.error("Error exporting to CSV: %s", e)
+    
+    def _csv_headers_for(self, sorted_keys: tuple) -> List[str]:
+        """CSV header row for the given label keys, reused across exports with the same keys"""
+        if self._csv_headers is None or self._csv_headers[0] != sorted_keys:
+            headers = ['id', 'start_time', 'end_time', 'code']
+            headers.extend(f'label_{key.lower()}' for key in sorted_keys)
+            self._csv_headers = (sorted_keys, headers)
+        return self._csv_headers[1]
     
     def print_sample_events(self, count: int = 5):
         """Print a sample of events for inspection"""
-        print(f"\nFirst {count} events:")
+        lines = [f"\nFirst {count} events:"]
+        append = lines.append
         for i, event in enumerate(self.events[:count]):
-            print(f"\nEvent {i+1}:")
-            print(f"  ID: {event.get('id')}")
-            print(f"  Time: {event.get('start_time')}-{event.get('end_time')}")
-            print(f"  Code: {event.get('code')}")
-            print("  Labels:")
-            for key, value in event.get('labels', {}).items():
-                print(f"    {key}: {value}")
+            append(f"\nEvent {i+1}:")
+            append(f"  ID: {event.id}")
+            append(f"  Time: {event.start_time}-{event.end_time}")
+            append(f"  Code: {event.code}")
+            append("  Labels:")
+            for key, value in event.labels.items():
+                append(f"    {key}: {value}")
+        
+        # One write instead of a print() per line
+        append('')
+        sys.stdout.write('\n'.join(lines))
 
 # Main execution
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    
     xml_file = "Bnei Yehuda Tel-Aviv 2-3 Hapoel Kfar Shalem 31.08.2025, Full match.xml"
     
     parser = InstatEventParser(xml_file)
     
-    if parser.parse_xml():
-        parser.extract_events()
-        
+    # Only summarize and export when the whole file was parsed
+    if parser.parse_xml() and parser.extract_events() is not None:
         # Display summary stats
         stats = parser.get_summary_stats()
         print("\n" + "="*50)
@@ -267,5 +435,5 @@ if __name__ == "__main__":
         print("- match_events.csv (tabular data)")
         print("\nParser ready! You can now use methods like:")
         print("- parser.get_events_by_action('Passes accurate')")
-        print("- parser.get_events_by_team('Bnei Yehuda Tel-Aviv')")
+        print("- parser.get_events_by_team('Bnei Yehuda Tel-Aviv', exact=False)")
         print("- parser.get_events_by_half('1')")
\ No newline at end of file
@@ -1,17 +1,58 @@
+from concurrent.futures import ProcessPoolExecutor
+import io
+import multiprocessing
+import os
+import re
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Reports are only ever saved to files, so render headless
 import matplotlib.pyplot as plt
 from matplotlib.patches import Circle
-from matplotlib.colors import LinearSegmentedColormap
+from matplotlib.colors import LinearSegmentedColormap, to_rgba
 import numpy as np
 from mplsoccer import Pitch
 from scipy.ndimage import gaussian_filter
 
+try:
+    import pyarrow  # noqa: F401 - only needed for pandas' multithreaded CSV reader
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
+
+# Column dtypes for the events CSV; coordinates and times fit comfortably in float32
+CSV_DTYPES = {
+    'label_pos_x': 'float32',
+    'label_pos_y': 'float32',
+    'start_time': 'float32',
+    'label_action': 'category',
+    'label_team': 'category'
+}
+
+# Event codes look like "19. Avihai Wodaje (1572040) - Passes accurate"; captures the player name
+CODE_RE = re.compile(r'^\s*\d+\.\s*([^()]+?)\s*\(')
+
+# White to darkblue heatmap colormap, shared by every report
+HEATMAP_CMAP = LinearSegmentedColormap.from_list("white_to_darkblue", ["white", "blue"])
+
+# Upper bound on report worker processes; each 300 dpi render peaks at several hundred MB
+MAX_REPORT_WORKERS = 4
+
+# Report generator owned by each worker_pool process
+_worker_report = None
+
 class PlayerReport:
-    def __init__(self, csv_file_path: str):
+    def __init__(self, csv_file_path: str, df: pd.DataFrame = None):
         """Initialize the corrected player report generator with match data"""
         self.csv_file = csv_file_path
         self.df = None
-        self.load_data()
+        self.player_groups = {}
+        self.team_groups = {}
+        self.interval_edges = None
+        self.team_avg_actions = {}
+        
+        # Pitches are identical for every subplot, so build them once and reuse
+        self.pitch = Pitch(pitch_color='white', line_color='black', linewidth=2, pitch_length=105, pitch_width=68)
+        self.heatmap_pitch = Pitch(pitch_color='white', line_color='black', linewidth=2, pitch_length=105, pitch_width=68, line_zorder=2)
         
         # Action mappings for different categories
         self.pass_actions = [
@@ -38,22 +79,83 @@ class PlayerReport:
             'Participation in counterattacks with shots'
         ]
         
+        # Fixed small-integer code for every known action (-1 for anything else)
+        self.action_codes = {
+            action: code for code, action in enumerate(
+                self.pass_actions + self.dribble_actions + self.defensive_actions + self.shooting_actions
+            )
+        }
+        
+        if df is None:
+            self.load_data()
+        else:
+            self.prepare_data(df)
+    
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame):
+        """Create a report generator from an events DataFrame with the CSV export's columns"""
+        return cls(None, df=df)
+        
     def load_data(self):
         """Load and prepare the CSV data"""
         try:
-            self.df = pd.read_csv(self.csv_file)
-            print(f"Loaded {len(self.df)} events from {self.csv_file}")
+            # Parse numeric and categorical columns straight into their final dtypes
+            # ("None" placeholders are read as missing values)
+            df = pd.read_csv(self.csv_file, engine=CSV_ENGINE, dtype=CSV_DTYPES)
+            print(f"Loaded {len(df)} events from {self.csv_file}")
+            
+            self.prepare_data(df)
             
-            # Clean and prepare data
-            self.df['label_pos_x'] = pd.to_numeric(self.df['label_pos_x'], errors='coerce')
-            self.df['label_pos_y'] = pd.to_numeric(self.df['label_pos_y'], errors='coerce')
-            self.df['start_time'] = pd.to_numeric(self.df['start_time'], errors='coerce')
+        except Exception as e:
+            print(f"Error loading data: {e}")
+    
+    def prepare_data(self, df: pd.DataFrame):
+        """Prepare an events DataFrame for reporting"""
+        try:
+            # Frames that did not come through read_csv still hold raw label strings;
+            # convert them the same way, treating "None" placeholders as missing values
+            converted = {}
+            for column, dtype in CSV_DTYPES.items():
+                if df[column].dtype != dtype:
+                    if dtype == 'float32':
+                        values = pd.to_numeric(df[column], errors='coerce')
+                    else:
+                        values = df[column].mask(df[column].isin(['None', '']))
+                    converted[column] = values.astype(dtype)
+            self.df = df.assign(**converted)
             
             # Remove rows with invalid coordinates
             self.df = self.df.dropna(subset=['label_pos_x', 'label_pos_y'])
             
+            # Keep events in time order (stable, so ties keep their file order); every per-player and
+            # per-team group below inherits the order, which lets time ranges be found by binary search
+            self.df = self.df.sort_values('start_time', kind='stable').reset_index(drop=True)
+            
+            # Extract the player name from codes like "19. Avihai Wodaje (1572040) - Passes accurate"
+            # once, and pre-split the events per player and per team
+            self.df['_player'] = self.df['code'].str.extract(CODE_RE, expand=False)
+            self.df['_action_code'] = self.df['label_action'].map(self.action_codes).fillna(-1).astype('int8')
+            
+            # Low-cardinality string columns are categoricals so equality/isin compare integer codes
+            # (label_team and label_action are already read as categories)
+            self.df['_player'] = self.df['_player'].astype('category')
+            
+            self.player_groups = dict(tuple(self.df.groupby('_player', observed=True, sort=False)))
+            self.team_groups = dict(tuple(self.df.groupby('label_team', observed=True, sort=False)))
+            
+            # 5-minute interval edges covering at least 90 minutes, and each team's average actions per
+            # interval, are the same for every player's involvement chart
+            max_time = max(5400, self.df['start_time'].max())
+            interval_starts = np.arange(0, int(max_time), 300)
+            self.interval_edges = np.append(interval_starts, interval_starts[-1] + 300)
+            self.team_avg_actions = {}
+            for team, team_events in self.team_groups.items():
+                team_players = set(team_events['_player'].dropna().unique()) - {'', 'None'}
+                if team_players:
+                    self.team_avg_actions[team] = (self._interval_counts(team_events) / len(team_players)).tolist()
+            
         except Exception as e:
-            print(f"Error loading data: {e}")
+            print(f"Error preparing data: {e}")
             
     def get_player_list(self, team_name=None):
         """Get list of all players, optionally filtered by team"""
@@ -62,60 +164,60 @@ class PlayerReport:
         else:
             team_df = self.df
             
-        # Extract player names from the code column
-        players = set()
-        for code in team_df['code'].dropna():
-            if ' - ' in code and '.' in code and '(' in code:
-                player_part = code.split(' - ')[0]
-                player_name = player_part.split('.', 1)[1].split('(')[0].strip()
-                if player_name and player_name != 'None':
-                    players.add(player_name)
-        
-        return sorted(list(players))
+        # Player names were extracted from the code column once in prepare_data
+        players = team_df['_player'].dropna().unique().tolist()
+        return sorted(player for player in players if player and player != 'None')
     
     def get_player_events(self, player_name: str):
         """Get all events for a specific player"""
-        player_events = self.df[self.df['code'].str.contains(f' {player_name} ', na=False)]
-        return player_events
+        return self.player_groups.get(player_name, self.df.iloc[:0])
+    
+    def _interval_counts(self, events):
+        """Number of events in each 5-minute interval"""
+        # Events are sorted by start_time, so the half-open [start, end) intervals are
+        # the gaps between the edges' insertion points
+        return np.diff(np.searchsorted(events['start_time'].to_numpy(), self.interval_edges))
+    
+    def _filter_actions(self, events, actions):
+        """Rows of events whose action is one of the given known actions"""
+        return events[events['_action_code'].isin([self.action_codes[action] for action in actions])]
     
-    def create_passes_dots_map(self, player_name: str, ax, title_suffix=""):
+    def _layered_scatter(self, ax, layers, **kwargs):
+        """Draw (events, color, alpha) layers as one scatter, later layers on top"""
+        x = np.concatenate([events['label_pos_x'].to_numpy() for events, _, _ in layers])
+        y = np.concatenate([events['label_pos_y'].to_numpy() for events, _, _ in layers])
+        
+        # Per-point face and edge colors carry each layer's alpha, as separate scatters would
+        face_colors = np.repeat(
+            [to_rgba(color, alpha) for _, color, alpha in layers], [len(events) for events, _, _ in layers], axis=0
+        ).reshape(-1, 4)
+        edge_colors = face_colors.copy()
+        edge_colors[:, :3] = 0  # black edges
+        
+        ax.scatter(x, y, c=face_colors, edgecolors=edge_colors, rasterized=True, **kwargs)
+    
+    def create_passes_dots_map(self, player_name: str, ax, title_suffix="", player_events=None):
         """Create passes map with ONLY dots (no misleading arrows)"""
-        pitch = Pitch(pitch_color='white', line_color='black', linewidth=2, pitch_length=105, pitch_width=68)
-        pitch.draw(ax=ax)
+        self.pitch.draw(ax=ax)
         
-        player_events = self.get_player_events(player_name)
-        pass_events = player_events[player_events['label_action'].isin(self.pass_actions)]
+        if player_events is None:
+            player_events = self.get_player_events(player_name)
+        pass_events = self._filter_actions(player_events, self.pass_actions)
         
         # Categorize passes
-        progressive_passes = pass_events[pass_events['label_action'] == 'Progressive passes accurate']
-        successful_passes = pass_events[
-            (pass_events['label_action'] == 'Passes accurate') |
-            (pass_events['label_action'] == 'Passes forward accurate')
-        ]
-        unsuccessful_passes = pass_events[
-            (pass_events['label_action'] == 'Inaccurate passes') |
-            (pass_events['label_action'] == 'Incomplete passes forward') |
-            (pass_events['label_action'] == 'Passes inaccurate')
-        ]
-        
-        # Draw dots only - no arrows!
-        # Unsuccessful passes (lowest layer)
-        for _, event in unsuccessful_passes.iterrows():
-            x, y = event['label_pos_x'], event['label_pos_y']
-            ax.scatter(x, y, c='grey', s=100, alpha=0.4, marker='o', zorder=1, 
-                      edgecolors='black', linewidths=1)
-            
-        # Successful passes
-        for _, event in successful_passes.iterrows():
-            x, y = event['label_pos_x'], event['label_pos_y']
-            ax.scatter(x, y, c='#4444FF', s=100, alpha=0.7, marker='o', zorder=2, 
-                      edgecolors='black', linewidths=1)
-            
-        # Progressive passes (highest layer)
-        for _, event in progressive_passes.iterrows():
-            x, y = event['label_pos_x'], event['label_pos_y']
-            ax.scatter(x, y, c='yellow', s=100, alpha=0.8, marker='o', zorder=3, 
-                      edgecolors='black', linewidths=1)
+        progressive_passes = self._filter_actions(pass_events, ['Progressive passes accurate'])
+        successful_passes = self._filter_actions(pass_events, ['Passes accurate', 'Passes forward accurate'])
+        unsuccessful_passes = self._filter_actions(
+            pass_events, ['Inaccurate passes', 'Incomplete passes forward', 'Passes inaccurate']
+        )
+        
+        # Draw dots only - no arrows! One scatter for all categories, unsuccessful passes
+        # drawn first (lowest layer) and progressive passes last (highest layer)
+        self._layered_scatter(ax, [
+            (unsuccessful_passes, 'grey', 0.4),
+            (successful_passes, '#4444FF', 0.7),
+            (progressive_passes, 'yellow', 0.8)
+        ], s=100, marker='o', zorder=1, linewidths=1)
         
         ax.set_title(f'{player_name} - Passes Map{title_suffix}', 
                     fontsize=12, fontweight='bold', color='black', pad=15)
@@ -133,34 +235,26 @@ class PlayerReport:
         
         return len(successful_passes), len(unsuccessful_passes), len(progressive_passes)
     
-    def create_dribbles_dots_map(self, player_name: str, ax, title_suffix=""):
+    def create_dribbles_dots_map(self, player_name: str, ax, title_suffix="", player_events=None):
         """Create dribbles map with dots"""
-        pitch = Pitch(pitch_color='white', line_color='black', linewidth=2, pitch_length=105, pitch_width=68)
-        pitch.draw(ax=ax)
+        self.pitch.draw(ax=ax)
         
-        player_events = self.get_player_events(player_name)
-        dribble_events = player_events[player_events['label_action'].isin(self.dribble_actions)]
+        if player_events is None:
+            player_events = self.get_player_events(player_name)
+        dribble_events = self._filter_actions(player_events, self.dribble_actions)
         
-        successful_dribbles = dribble_events[
-            (dribble_events['label_action'] == 'Dribbling successful') |
-            (dribble_events['label_action'] == 'Take on successful')
-        ]
+        successful_dribbles = self._filter_actions(dribble_events, ['Dribbling successful', 'Take on successful'])
         
-        unsuccessful_dribbles = dribble_events[
-            (dribble_events['label_action'] == 'Dribbling unsuccessful') |
-            (dribble_events['label_action'] == 'Take on unsuccessful')
-        ]
+        unsuccessful_dribbles = self._filter_actions(dribble_events, ['Dribbling unsuccessful', 'Take on unsuccessful'])
         
         # Draw dots for dribbles with consistent size
-        for _, event in unsuccessful_dribbles.iterrows():
-            x, y = event['label_pos_x'], event['label_pos_y']
-            ax.scatter(x, y, c='#FF4444', s=100, alpha=0.7, marker='x', 
-                      linewidths=3, zorder=2, edgecolors='black')
+        ax.scatter(unsuccessful_dribbles['label_pos_x'].to_numpy(), unsuccessful_dribbles['label_pos_y'].to_numpy(),
+                  c='#FF4444', s=100, alpha=0.7, marker='x', 
+                  linewidths=3, zorder=2, edgecolors='black', rasterized=True)
             
-        for _, event in successful_dribbles.iterrows():
-            x, y = event['label_pos_x'], event['label_pos_y']
-            ax.scatter(x, y, c='#4444FF', s=100, alpha=1.0, marker='o', 
-                      zorder=3, edgecolors='black', linewidths=2)
+        ax.scatter(successful_dribbles['label_pos_x'].to_numpy(), successful_dribbles['label_pos_y'].to_numpy(),
+                  c='#4444FF', s=100, alpha=1.0, marker='o', 
+                  zorder=3, edgecolors='black', linewidths=2, rasterized=True)
         
         ax.set_title(f'{player_name} - Dribbles Map{title_suffix}', 
                     fontsize=12, fontweight='bold', color='black', pad=15)
@@ -177,45 +271,39 @@ class PlayerReport:
         
         return len(successful_dribbles), len(unsuccessful_dribbles)
     
-    def create_defensive_dots_map(self, player_name: str, ax, title_suffix=""):
+    def create_defensive_dots_map(self, player_name: str, ax, title_suffix="", player_events=None):
         """Create defensive actions map with separated legend for each action type"""
-        pitch = Pitch(pitch_color='white', line_color='black', linewidth=2, pitch_length=105, pitch_width=68)
-        pitch.draw(ax=ax)
+        self.pitch.draw(ax=ax)
         
-        player_events = self.get_player_events(player_name)
-        defensive_events = player_events[player_events['label_action'].isin(self.defensive_actions)]
+        if player_events is None:
+            player_events = self.get_player_events(player_name)
+        defensive_events = self._filter_actions(player_events, self.defensive_actions)
         
-        # Separate by action type
-        interceptions = defensive_events[defensive_events['label_action'] == 'Interceptions']
-        ball_recoveries = defensive_events[defensive_events['label_action'] == 'Ball recoveries']
-        tackles_successful = defensive_events[defensive_events['label_action'] == 'Tackles successful']
-        challenges_won = defensive_events[defensive_events['label_action'] == 'Challenges won']
-        clearances = defensive_events[defensive_events['label_action'] == 'Clearances']
+        # Separate by action type, keeping only the action types the player actually has
+        events_by_action = dict(list(defensive_events.groupby('label_action', observed=True, sort=False)))
         
         # Draw different colored dots for each action type
-        colors = ['red', 'green', 'orange', 'blue', 'purple']
         action_types = [
-            (interceptions, 'Interceptions', 'red'),
-            (ball_recoveries, 'Ball Recovery', 'green'), 
-            (tackles_successful, 'Tackles', 'orange'),
-            (challenges_won, 'Challenges', 'blue'),
-            (clearances, 'Clearances', 'purple')
+            ('Interceptions', 'Interceptions', 'red'),
+            ('Ball recoveries', 'Ball Recovery', 'green'), 
+            ('Tackles successful', 'Tackles', 'orange'),
+            ('Challenges won', 'Challenges', 'blue'),
+            ('Clearances', 'Clearances', 'purple')
         ]
         
-        legend_elements = []
-        
-        for events, label, color in action_types:
-            if len(events) > 0:
-                for _, event in events.iterrows():
-                    x, y = event['label_pos_x'], event['label_pos_y']
-                    ax.scatter(x, y, c=color, s=100, alpha=0.8, marker='o', 
-                              zorder=3, edgecolors='black', linewidths=1)
-                
-                legend_elements.append(
-                    plt.Line2D([0], [0], marker='o', color='w', markerfacecolor=color, 
-                              markersize=8, alpha=0.8, label=label,
-                              markeredgecolor='black', markeredgewidth=1)
-                )
+        present_types = [action_type for action_type in action_types if action_type[0] in events_by_action]
+        
+        # One scatter for every present action type, with a legend entry per type
+        if present_types:
+            self._layered_scatter(ax, [(events_by_action[action], color, 0.8) for action, _, color in present_types],
+                                  s=100, marker='o', zorder=3, linewidths=1)
+        
+        legend_elements = [
+            plt.Line2D([0], [0], marker='o', color='w', markerfacecolor=color, 
+                      markersize=8, alpha=0.8, label=label,
+                      markeredgecolor='black', markeredgewidth=1)
+            for _, label, color in present_types
+        ]
         
         ax.set_title('Defensive Actions', fontsize=12, fontweight='bold', color='black', pad=15)
         
@@ -224,55 +312,43 @@ class PlayerReport:
         
         return len(defensive_events)
     
-    def create_shot_map(self, player_name: str, ax, title_suffix=""):
+    def create_shot_map(self, player_name: str, ax, title_suffix="", player_events=None):
         """Create shot map with stars for goals, X for off-target, dots for on-target"""
-        pitch = Pitch(pitch_color='white', line_color='black', linewidth=2, pitch_length=105, pitch_width=68)
-        pitch.draw(ax=ax)
+        self.pitch.draw(ax=ax)
         
-        player_events = self.get_player_events(player_name)
+        if player_events is None:
+            player_events = self.get_player_events(player_name)
         
         # Get shooting events
-        goals = player_events[player_events['label_action'] == 'Goals']
-        all_shots_on_target = player_events[player_events['label_action'] == 'Shots on target']
-        shots_off_target = player_events[player_events['label_action'] == 'Shots off target']
-        
-        # Remove shots on target that are also goals (same time and position)
-        shots_on_target = []
-        for _, shot in all_shots_on_target.iterrows():
-            is_also_goal = False
-            for _, goal in goals.iterrows():
-                if (abs(shot['start_time'] - goal['start_time']) < 1 and 
-                    abs(shot['label_pos_x'] - goal['label_pos_x']) < 0.1 and 
-                    abs(shot['label_pos_y'] - goal['label_pos_y']) < 0.1):
-                    is_also_goal = True
-                    break
-            if not is_also_goal:
-                shots_on_target.append(shot)
-        
-        # Convert back to DataFrame-like structure for iteration
-        import pandas as pd
-        if shots_on_target:
-            shots_on_target = pd.DataFrame(shots_on_target)
-        else:
-            shots_on_target = pd.DataFrame()  # Empty DataFrame
+        goals = self._filter_actions(player_events, ['Goals'])
+        all_shots_on_target = self._filter_actions(player_events, ['Shots on target'])
+        shots_off_target = self._filter_actions(player_events, ['Shots off target'])
+        
+        # Remove shots on target that are also goals (same time and position),
+        # matching on rounded time/position keys instead of comparing every pair
+        def match_keys(events):
+            return pd.MultiIndex.from_arrays([
+                events['start_time'].round().to_numpy(),
+                (events['label_pos_x'] * 10).round().to_numpy(),
+                (events['label_pos_y'] * 10).round().to_numpy()
+            ])
+        
+        shots_on_target = all_shots_on_target[~match_keys(all_shots_on_target).isin(match_keys(goals))]
         
         # Draw shots off target (X markers) - keep scatter for X shape
-        for _, event in shots_off_target.iterrows():
-            x, y = event['label_pos_x'], event['label_pos_y']
-            ax.scatter(x, y, c='#FF4444', s=120, alpha=0.8, marker='x', 
-                      linewidths=4, zorder=2, edgecolors='black')
+        ax.scatter(shots_off_target['label_pos_x'].to_numpy(), shots_off_target['label_pos_y'].to_numpy(),
+                  c='#FF4444', s=120, alpha=0.8, marker='x', 
+                  linewidths=4, zorder=2, edgecolors='black', rasterized=True)
         
         # Draw shots on target (dots) - use consistent size
-        for _, event in shots_on_target.iterrows():
-            x, y = event['label_pos_x'], event['label_pos_y']
-            ax.scatter(x, y, c='#4444FF', s=100, alpha=0.8, marker='o', 
-                      zorder=3, edgecolors='black', linewidths=2)
+        ax.scatter(shots_on_target['label_pos_x'].to_numpy(), shots_on_target['label_pos_y'].to_numpy(),
+                  c='#4444FF', s=100, alpha=0.8, marker='o', 
+                  zorder=3, edgecolors='black', linewidths=2, rasterized=True)
         
         # Draw goals (stars) - keep scatter for star shape
-        for _, event in goals.iterrows():
-            x, y = event['label_pos_x'], event['label_pos_y']
-            ax.scatter(x, y, c='gold', s=200, alpha=1.0, marker='*', 
-                      zorder=4, edgecolors='black', linewidths=2)
+        ax.scatter(goals['label_pos_x'].to_numpy(), goals['label_pos_y'].to_numpy(),
+                  c='gold', s=200, alpha=1.0, marker='*', 
+                  zorder=4, edgecolors='black', linewidths=2, rasterized=True)
         
         ax.set_title(f'{player_name} - Shot Map{title_suffix}', 
                     fontsize=12, fontweight='bold', color='black', pad=15)
@@ -292,13 +368,14 @@ class PlayerReport:
         
         return len(goals), len(shots_on_target), len(shots_off_target)
     
-    def create_heatmap(self, player_name: str, ax, title_suffix=""):
+    def create_heatmap(self, player_name: str, ax, title_suffix="", player_events=None):
         """Create activity heatmap with gaussian filter and white-to-blue design"""
         # Keep regular pitch format but use your heatmap design
-        pitch_heat = Pitch(pitch_color='white', line_color='black', linewidth=2, pitch_length=105, pitch_width=68, line_zorder=2)
+        pitch_heat = self.heatmap_pitch
         pitch_heat.draw(ax=ax)
         
-        player_events = self.get_player_events(player_name)
+        if player_events is None:
+            player_events = self.get_player_events(player_name)
         
         if len(player_events) < 5:  # Not enough data for heatmap
             ax.text(52.5, 34, 'Insufficient data\nfor heatmap', 
@@ -311,9 +388,6 @@ class PlayerReport:
         x_coords = player_events['label_pos_x'].values
         y_coords = player_events['label_pos_y'].values
         
-        # Create white to darkblue colormap exactly like your example
-        cmap_heat = LinearSegmentedColormap.from_list("white_to_darkblue", ["white", "blue"])
-        
         # Create bin statistic with same parameters as your example
         bin_stat = pitch_heat.bin_statistic(x_coords, y_coords, statistic='count', bins=(20, 20))
         
@@ -321,57 +395,30 @@ class PlayerReport:
         bin_stat['statistic'] = gaussian_filter(bin_stat['statistic'], 1)
         
         # Create heatmap with white edges exactly like your example
-        pitch_heat.heatmap(bin_stat, ax=ax, cmap=cmap_heat, edgecolors='white')
+        pitch_heat.heatmap(bin_stat, ax=ax, cmap=HEATMAP_CMAP, edgecolors='white', rasterized=True)
         
         # Set title exactly like your example
         ax.set_title('Heatmap', fontsize=16, color='black')
         
         return len(player_events)
     
-    def create_involvement_line_chart(self, player_name: str, ax, title_suffix=""):
+    def create_involvement_line_chart(self, player_name: str, ax, title_suffix="", player_events=None):
         """Create player involvement line chart with 5-minute intervals"""
-        player_events = self.get_player_events(player_name)
+        if player_events is None:
+            player_events = self.get_player_events(player_name)
         if len(player_events) == 0:
             ax.text(0.5, 0.5, 'No data available for this player', 
                    transform=ax.transAxes, ha='center', va='center', fontsize=12)
             return [], []
             
+        # Calculate actions per 5-minute intervals (edges and team averages are shared by all players)
+        interval_starts = self.interval_edges[:-1]
+        interval_labels = [f'{i//60}' for i in interval_starts]
+        player_actions = self._interval_counts(player_events).tolist()
+        
+        # Team average actions per interval
         player_team = player_events['label_team'].iloc[0]
-        team_events = self.df[self.df['label_team'] == player_team]
-        
-        # Get unique players in the team
-        team_players = set()
-        for code in team_events['code'].dropna():
-            if ' - ' in code and '.' in code and '(' in code:
-                player_part = code.split(' - ')[0]
-                player_name_extracted = player_part.split('.', 1)[1].split('(')[0].strip()
-                if player_name_extracted and player_name_extracted != 'None':
-                    team_players.add(player_name_extracted)
-        
-        # Calculate actions per 5-minute intervals
-        max_time = max(self.df['start_time'].max(), 5400)  # At least 90 minutes
-        intervals = [(i, i+300) for i in range(0, int(max_time), 300)]  # 5-minute intervals
-        interval_labels = [f'{i//60}' for i in range(0, int(max_time), 300)]
-        
-        player_actions = []
-        team_avg_actions = []
-        
-        for start, end in intervals:
-            # Player actions in this interval
-            player_interval = player_events[
-                (player_events['start_time'] >= start) & 
-                (player_events['start_time'] < end)
-            ]
-            player_count = len(player_interval)
-            player_actions.append(player_count)
-            
-            # Team average actions in this interval
-            team_interval = team_events[
-                (team_events['start_time'] >= start) & 
-                (team_events['start_time'] < end)
-            ]
-            team_avg = len(team_interval) / len(team_players) if team_players else 0
-            team_avg_actions.append(team_avg)
+        team_avg_actions = list(self.team_avg_actions.get(player_team, [0] * len(interval_starts)))
         
         x = np.arange(len(interval_labels))
         
@@ -397,9 +444,9 @@ class PlayerReport:
         
         return player_actions, team_avg_actions
     
-    def generate_complete_report(self, player_name: str, output_file: str = None):
+    def generate_complete_report(self, player_name: str, output_file: str = None, return_bytes: bool = False):
         """Generate complete corrected player report with performance summary"""
-        if output_file is None:
+        if output_file is None and not return_bytes:
             output_file = f"{player_name.replace(' ', '_')}_corrected_report.png"
         
         # Create figure with enhanced layout
@@ -419,8 +466,10 @@ class PlayerReport:
         ax5 = fig.add_subplot(gs[1, 1])  # Heatmap
         ax6 = fig.add_subplot(gs[1, 2])  # Player involvement line chart
         
-        # Calculate effective time first
+        # Filter the player's events once and share them with every subplot
         player_events = self.get_player_events(player_name)
+        
+        # Calculate effective time first
         if len(player_events) > 0:
             first_action_time = player_events['start_time'].min()
             last_action_time = player_events['start_time'].max()
@@ -430,12 +479,12 @@ class PlayerReport:
             effective_time = 0
         
         # Generate all visualizations
-        pass_stats = self.create_passes_dots_map(player_name, ax1)
-        dribble_stats = self.create_dribbles_dots_map(player_name, ax2)
-        defensive_count = self.create_defensive_dots_map(player_name, ax3)
-        shot_stats = self.create_shot_map(player_name, ax4)
-        self.create_heatmap(player_name, ax5)
-        self.create_involvement_line_chart(player_name, ax6)
+        pass_stats = self.create_passes_dots_map(player_name, ax1, player_events=player_events)
+        dribble_stats = self.create_dribbles_dots_map(player_name, ax2, player_events=player_events)
+        defensive_count = self.create_defensive_dots_map(player_name, ax3, player_events=player_events)
+        shot_stats = self.create_shot_map(player_name, ax4, player_events=player_events)
+        self.create_heatmap(player_name, ax5, player_events=player_events)
+        self.create_involvement_line_chart(player_name, ax6, player_events=player_events)
         
         # Add main title with effective time - move higher for more space
         fig.suptitle(f'{player_name.upper()} - REPORT\nEffective Time - {effective_time} Minutes', 
@@ -445,34 +494,33 @@ class PlayerReport:
         summary_ax = fig.add_subplot(gs[2:, :])
         summary_ax.axis('off')
         
-        # We already calculated effective_time above, so just get player_events for other calculations
-        # (removed duplicate calculation)
-        
         # Create detailed performance summary with better formatting
         # Calculate additional stats for new format
         total_passes = pass_stats[0] + pass_stats[1]  # successful + unsuccessful
         total_shots = shot_stats[0] + shot_stats[1] + shot_stats[2]  # goals + on target + off target
         total_dribbles = dribble_stats[0] + dribble_stats[1]  # successful + unsuccessful
         
-        # Get specific defensive actions for new breakdown
-        player_events = self.get_player_events(player_name)
-        challenges = player_events[player_events['label_action'].isin(['Challenges won', 'Challenges unsuccessful'])]
-        challenges_won = len(player_events[player_events['label_action'] == 'Challenges won'])
-        ball_recoveries = len(player_events[player_events['label_action'] == 'Ball recoveries'])
+        # Get specific defensive actions for new breakdown, counting every action code in one pass
+        # (codes are shifted by one so unknown actions land in bin 0)
+        action_codes = player_events['_action_code'].to_numpy()
+        action_counts = np.bincount(action_codes + 1, minlength=len(self.action_codes) + 1)
+        challenges_won = action_counts[self.action_codes['Challenges won'] + 1]
+        challenges = challenges_won + action_counts[self.action_codes['Challenges unsuccessful'] + 1]
+        ball_recoveries = action_counts[self.action_codes['Ball recoveries'] + 1]
         
         # Calculate ball recoveries in opponent half (assuming x > 50 is opponent half)
-        ball_recoveries_opp_half = len(player_events[
-            (player_events['label_action'] == 'Ball recoveries') & 
-            (player_events['label_pos_x'] > 50)
-        ])
+        ball_recoveries_opp_half = np.count_nonzero(
+            (action_codes == self.action_codes['Ball recoveries']) &
+            (player_events['label_pos_x'].to_numpy() > 50)
+        )
         
         performance_text = f"""COMPREHENSIVE PERFORMANCE SUMMARY
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 PASSING                          ATTACKING                        DEFENDING
 Total Passes             {total_passes:>3}     Total Shots          {total_shots:>3}     Total Defensive Actions  {defensive_count:>3}
-Accurate Passes          {pass_stats[0]:>3}     Shots on Target      {shot_stats[1]:>3}     Challenges               {len(challenges):>3}
-Success Rate         {(pass_stats[0]/(max(total_passes, 1))*100):>6.1f}%     Shot Rate %      {(shot_stats[1]/(max(total_shots, 1))*100):>6.1f}%     Success Rate         {(challenges_won/(max(len(challenges), 1))*100):>6.1f}%
+Accurate Passes          {pass_stats[0]:>3}     Shots on Target      {shot_stats[1]:>3}     Challenges               {challenges:>3}
+Success Rate         {(pass_stats[0]/(max(total_passes, 1))*100):>6.1f}%     Shot Rate %      {(shot_stats[1]/(max(total_shots, 1))*100):>6.1f}%     Success Rate         {(challenges_won/(max(challenges, 1))*100):>6.1f}%
 Progressive Passes       {pass_stats[2]:>3}     Dribbles             {total_dribbles:>3}     Ball Recoveries          {ball_recoveries:>3}
                                  Successful Dribbles  {dribble_stats[0]:>3}     Ball Recoveries Opp Half {ball_recoveries_opp_half:>3}
 Success Rate %   {(dribble_stats[0]/(max(total_dribbles, 1))*100):>6.1f}%
@@ -488,13 +536,78 @@ KEY INSIGHTS
                                 edgecolor='#dee2e6', linewidth=2),
                        family='monospace')
         
-        plt.tight_layout()
-        plt.savefig(output_file, dpi=300, bbox_inches='tight', facecolor='white')
-        # plt.show()
+        # Spacing comes from the gridspec, so no tight_layout pass is needed
+        if return_bytes:
+            # Render the PNG in memory instead of writing it to disk
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format='png', dpi=300, bbox_inches='tight', facecolor='white')
+            plt.close(fig)
+            return buffer.getvalue()
+        
+        fig.savefig(output_file, dpi=300, bbox_inches='tight', facecolor='white')
+        plt.close(fig)  # Free the figure's artists when generating many reports
         
         print(f"Corrected player report saved as: {output_file}")
         return output_file
 
+    def generate_many(self, players, workers=None):
+        """Generate complete reports for several players in parallel worker processes"""
+        players = list(players)
+        workers = PlayerReport.pool_size(workers or len(players))
+        if workers == 1:
+            # A single worker would only add start-up time and a second copy of the match data
+            return [self.generate_complete_report(player) for player in players]
+        
+        with self.worker_pool(workers) as executor:
+            return list(executor.map(PlayerReport.generate_in_worker, players))
+    
+    @staticmethod
+    def pool_size(workers=None):
+        """Number of worker processes worker_pool starts for the requested count"""
+        # Every worker starts up front and holds its own copy of the match data, so keep the pool small
+        return max(1, min(workers or MAX_REPORT_WORKERS, MAX_REPORT_WORKERS, os.cpu_count() or 1))
+    
+    def worker_pool(self, workers=None):
+        """Process pool whose workers each build their own report generator for this match
+        
+        workers: number of worker processes, capped at MAX_REPORT_WORKERS and the CPU count
+        """
+        return PlayerReport.create_pool(self.csv_file, self.df, workers)
+    
+    @staticmethod
+    def create_pool(csv_file_path: str = None, df: pd.DataFrame = None, workers=None):
+        """Process pool for a match CSV or events DataFrame, without preparing a report generator here
+        
+        workers: number of worker processes, capped at MAX_REPORT_WORKERS and the CPU count
+        """
+        workers = PlayerReport.pool_size(workers)
+        
+        # Start workers from a clean process rather than forking the caller (e.g. Streamlit's
+        # multi-threaded server)
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('forkserver')
+        else:
+            context = multiprocessing.get_context('spawn')
+        
+        # Workers reload the CSV when there is one, otherwise they receive the events DataFrame once
+        if csv_file_path is not None:
+            initargs = (csv_file_path, None)
+        else:
+            initargs = (None, df)
+        return ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                   initializer=PlayerReport._init_worker, initargs=initargs)
+    
+    @staticmethod
+    def _init_worker(csv_file_path: str, df: pd.DataFrame = None):
+        """Worker initializer for worker_pool"""
+        global _worker_report
+        _worker_report = PlayerReport(csv_file_path, df=df)
+    
+    @staticmethod
+    def generate_in_worker(player_name: str, output_file: str = None, return_bytes: bool = False):
+        """Generate a complete report inside a worker_pool process"""
+        return _worker_report.generate_complete_report(player_name, output_file, return_bytes)
+
 # Main execution
 if __name__ == "__main__":
     import sys
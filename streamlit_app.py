@@ -1,22 +1,18 @@
 import streamlit as st
 import pandas as pd
+import hashlib
 import xml.etree.ElementTree as ET
-import tempfile
-import os
-import io
-from player_report import PlayerReport
+from concurrent.futures import as_completed
+from player_report import CODE_RE, PlayerReport
 from instat_parser import InstatEventParser
-
-# Set page config
-st.set_page_config(
-    page_title="SportBase - Player Performance Reports",
-    page_icon="⚽",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+try:
+    import pyarrow  # noqa: F401 - backs the Arrow string columns
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
 
 # Custom CSS for better styling
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     .main-header {
         font-size: 3rem;
@@ -53,76 +49,89 @@ st.markdown("""
         border-radius: 5px;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Set page config
+st.set_page_config(
+    page_title="SportBase - Player Performance Reports",
+    page_icon="⚽",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Streamlit drops elements a rerun does not emit again, so the CSS is injected on every run
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 def parse_uploaded_xml(uploaded_file):
     """Parse uploaded XML file and return CSV data"""
     try:
-        # Save uploaded file to temporary location
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xml') as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
-            tmp_xml_path = tmp_file.name
-        
-        # Parse XML using existing parser
-        parser = InstatEventParser(tmp_xml_path)
-        if parser.parse_xml():
-            events = parser.extract_events()
-            
-            # Convert to DataFrame
-            flattened_data = []
-            for event in events:
-                row = {
-                    'id': event.get('id'),
-                    'start_time': event.get('start_time'),
-                    'end_time': event.get('end_time'),
-                    'code': event.get('code')
-                }
-                
-                # Add all labels as separate columns
-                labels = event.get('labels', {})
-                for key, value in labels.items():
-                    row[f'label_{key.lower()}'] = value
-                
-                flattened_data.append(row)
-            
-            df = pd.DataFrame(flattened_data)
-            
-            # Clean up temp file
-            os.unlink(tmp_xml_path)
-            
-            return df, len(events)
-        else:
-            # Clean up temp file
-            os.unlink(tmp_xml_path)
-            return None, 0
-            
+        return parse_xml_bytes(uploaded_file.getvalue())
     except Exception as e:
         st.error(f"Error parsing XML file: {str(e)}")
-        return None, 0
+        return None, 0, [], 0
 
-def get_player_list_from_df(df):
-    """Extract player list from DataFrame"""
-    players = set()
-    for code in df['code'].dropna():
-        if ' - ' in code and '.' in code and '(' in code:
-            player_part = code.split(' - ')[0]
-            player_name = player_part.split('.', 1)[1].split('(')[0].strip()
-            if player_name and player_name != 'None':
-                players.add(player_name)
+@st.cache_data(show_spinner=False)
+def parse_xml_bytes(xml_bytes):
+    """Parse XML bytes into an events DataFrame, cached on the bytes so reruns skip parsing"""
+    # Hand the uploaded bytes straight to the parser, no temporary file needed
+    parser = InstatEventParser(xml_bytes)
+    events = parser.extract_events()
+    if events is None:
+        # Malformed XML; the caller shows the error box
+        return None, 0, [], 0
+    
+    # The parser builds the columnar frame (one column per label, named like the CSV export)
+    df = parser.df
+    df['start_time'] = df['start_time'].astype('float32')
+    df['end_time'] = df['end_time'].astype('float32')
+    if HAS_PYARROW:
+        # Arrow-backed strings keep the str.extract/unique calls on these columns in Arrow kernels
+        for column in ('code', 'label_team'):
+            df[column] = df[column].astype('string[pyarrow]')
+    
+    # Match information is computed here too, so it is cached with the parsed frame
+    teams = [team for team in df['label_team'].dropna().unique() if team != 'None']
+    match_duration = df['start_time'].max() / 60  # Convert to minutes
     
-    return sorted(list(players))
+    return df, len(events), teams, match_duration
 
-def get_match_info(df):
-    """Extract match information from DataFrame"""
-    teams = set()
-    for team in df['label_team'].dropna():
-        if team != 'None':
-            teams.add(team)
+@st.cache_data(show_spinner=False)
+def get_players_from_df(df):
+    """Extract the sorted player list and each team's players from DataFrame"""
+    # One regex pass over the code column; each player belongs to the team of their first event
+    names = df['code'].str.extract(CODE_RE, expand=False)
+    names = names[names.notna() & names.ne('None') & names.ne('')]
+    first_events = pd.DataFrame({'player': names, 'team': df['label_team'][names.index]}).dropna()
+    first_events = first_events.drop_duplicates('player')
     
-    # Get match duration
-    max_time = df['start_time'].max() / 60  # Convert to minutes
+    players = sorted(names.unique().tolist())
+    team_players = {team: sorted(team_df['player'].tolist()) for team, team_df in first_events.groupby('team', sort=False)}
+    return players, team_players
+
+def generate_reports(df, players):
+    """Yield (player, PNG bytes, error) for each player as their report finishes"""
+    if PlayerReport.pool_size(len(players)) == 1:
+        # A single worker would only add start-up time and a second copy of the match data
+        report_generator = PlayerReport.from_dataframe(df)
+        for player in players:
+            try:
+                yield player, report_generator.generate_complete_report(player, return_bytes=True), None
+            except Exception as e:
+                yield player, None, e
+        return
     
-    return list(teams), max_time
+    # Render the reports in parallel worker processes (at most one per player, capped by
+    # PlayerReport.pool_size). Each worker prepares the events itself, so none are prepared here.
+    with PlayerReport.create_pool(df=df, workers=len(players)) as executor:
+        futures = {
+            executor.submit(PlayerReport.generate_in_worker, player, return_bytes=True): player
+            for player in players
+        }
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
 
 def main():
     # Main header
@@ -144,19 +153,27 @@ def main():
     if uploaded_file is not None:
         st.markdown('<div class="info-box">📁 File uploaded successfully! Processing...</div>', unsafe_allow_html=True)
         
-        # Parse the uploaded file
-        with st.spinner('Parsing XML file...'):
-            df, event_count = parse_uploaded_xml(uploaded_file)
+        # Parse the uploaded file only when it changed; widget reruns reuse the session's match data
+        file_sha = hashlib.sha1(uploaded_file.getvalue()).hexdigest()
+        if st.session_state.get('file_sha') == file_sha:
+            df = st.session_state.match_data
+            event_count = st.session_state.event_count
+            teams, match_duration = st.session_state.teams_info
+            players, team_players = st.session_state.players_info
+        else:
+            with st.spinner('Parsing XML file...'):
+                df, event_count, teams, match_duration = parse_uploaded_xml(uploaded_file)
+            
+            if df is not None and len(df) > 0:
+                # Store data in session state
+                st.session_state.match_data = df
+                st.session_state.event_count = event_count
+                st.session_state.teams_info = (teams, match_duration)
+                st.session_state.players_info = get_players_from_df(df)
+                st.session_state.file_sha = file_sha
+                players, team_players = st.session_state.players_info
         
         if df is not None and len(df) > 0:
-            # Store data in session state
-            st.session_state.match_data = df
-            st.session_state.event_count = event_count
-            
-            # Get match information
-            teams, match_duration = get_match_info(df)
-            players = get_player_list_from_df(df)
-            
             st.markdown('<div class="success-box">✅ XML file parsed successfully!</div>', unsafe_allow_html=True)
             
             # Display match information
@@ -201,16 +218,6 @@ def main():
                     
             elif selection_method == "Select by team":
                 # Create team-based selection
-                team_players = {}
-                for player in players:
-                    # Get player's team from data
-                    player_events = df[df['code'].str.contains(f' {player} ', na=False)]
-                    if len(player_events) > 0:
-                        team = player_events['label_team'].iloc[0]
-                        if team not in team_players:
-                            team_players[team] = []
-                        team_players[team].append(player)
-                
                 selected_team = st.selectbox("Select team:", list(team_players.keys()))
                 if selected_team:
                     team_player_list = team_players[selected_team]
@@ -228,40 +235,28 @@ def main():
                 st.info(f"Ready to generate reports for {len(selected_players)} player(s)")
                 
                 if st.button("🚀 Generate Reports", type="primary"):
-                    # Create temporary CSV file for the report generator
-                    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as tmp_csv:
-                        df.to_csv(tmp_csv.name, index=False)
-                        tmp_csv_path = tmp_csv.name
-                    
                     try:
-                        # Initialize report generator
-                        report_generator = PlayerReport(tmp_csv_path)
-                        
                         # Progress bar
                         progress_bar = st.progress(0)
                         status_text = st.empty()
                         
                         generated_reports = []
+                        status_text.text(f'Generating reports for {len(selected_players)} player(s)...')
                         
-                        for i, player in enumerate(selected_players):
-                            status_text.text(f'Generating report for {player}...')
+                        for i, (player, report_png, error) in enumerate(generate_reports(df, selected_players)):
+                            status_text.text(f'Generated report for {player}')
                             progress_bar.progress((i + 1) / len(selected_players))
                             
-                            try:
-                                # Generate report
-                                output_file = f"{player.replace(' ', '_')}_report.png"
-                                report_path = report_generator.generate_complete_report(player, output_file)
-                                
-                                if os.path.exists(report_path):
-                                    generated_reports.append((player, report_path))
-                                    
-                            except Exception as e:
-                                st.error(f"Error generating report for {player}: {str(e)}")
+                            if error is None:
+                                # Reports come back as in-memory PNG bytes, nothing is written to disk
+                                generated_reports.append((player, report_png))
+                            else:
+                                st.error(f"Error generating report for {player}: {str(error)}")
                         
-                        status_text.text('Reports generated successfully!')
+                        # Show the reports in the order the players were selected
+                        generated_reports.sort(key=lambda report: selected_players.index(report[0]))
                         
-                        # Clean up temp CSV
-                        os.unlink(tmp_csv_path)
+                        status_text.text('Reports generated successfully!')
                         
                         if generated_reports:
                             st.markdown("---")
@@ -270,38 +265,29 @@ def main():
                             st.success(f"✅ Generated {len(generated_reports)} report(s) successfully!")
                             
                             # Display and provide download for each report
-                            for player, report_path in generated_reports:
+                            for player, report_png in generated_reports:
                                 st.markdown(f"### 📊 {player}")
                                 
                                 col1, col2 = st.columns([3, 1])
                                 
                                 with col1:
                                     # Display the report image
-                                    st.image(report_path, caption=f"{player} - Performance Report")
+                                    st.image(report_png, caption=f"{player} - Performance Report")
                                 
                                 with col2:
                                     # Provide download button
-                                    with open(report_path, "rb") as file:
-                                        st.download_button(
-                                            label=f"📥 Download {player} Report",
-                                            data=file.read(),
-                                            file_name=f"{player.replace(' ', '_')}_performance_report.png",
-                                            mime="image/png",
-                                            key=f"download_{player}"
-                                        )
+                                    st.download_button(
+                                        label=f"📥 Download {player} Report",
+                                        data=report_png,
+                                        file_name=f"{player.replace(' ', '_')}_performance_report.png",
+                                        mime="image/png",
+                                        key=f"download_{player}"
+                                    )
                                 
                                 st.markdown("---")
-                            
-                            # Cleanup generated files
-                            for _, report_path in generated_reports:
-                                if os.path.exists(report_path):
-                                    os.unlink(report_path)
                     
                     except Exception as e:
                         st.error(f"Error in report generation process: {str(e)}")
-                        # Clean up temp CSV
-                        if os.path.exists(tmp_csv_path):
-                            os.unlink(tmp_csv_path)
         else:
             st.markdown('<div class="error-box">❌ Error parsing XML file. Please check the file format.</div>', unsafe_allow_html=True)
     